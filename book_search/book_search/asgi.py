@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'book_search.settings')
 
 application = get_asgi_application()
+
+# Only serving processes warm their cache, not manage.py commands
+from django.conf import settings  # noqa: E402
+
+if settings.BOOK_CACHE_WARMUP_ON_STARTUP:
+    from books.warmup import start_background_warmup
+
+    start_background_warmup()
@@ -132,5 +132,69 @@ CACHES = {
         'OPTIONS': {
             'MAX_ENTRIES': 1000,
         },
-    }
-}
\ No newline at end of file
+    },
+    # Lookup job state, kept apart so book entries never cull pending jobs and on
+    # disk so every worker process sees it: the status or stream request for a job
+    # may reach a different worker than the one that queued it
+    'jobs': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('BOOK_JOB_CACHE_DIR', default=str(BASE_DIR / 'job_cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+# Cache warm-up from recent SearchHistory popularity; the startup warm-up runs in
+# each process that loads wsgi.py or asgi.py, never in manage.py commands
+BOOK_CACHE_WARMUP_ON_STARTUP = config('BOOK_CACHE_WARMUP_ON_STARTUP', default=False, cast=bool)
+BOOK_CACHE_WARMUP_LIMIT = config('BOOK_CACHE_WARMUP_LIMIT', default=500, cast=int)
+BOOK_CACHE_WARMUP_WINDOW_DAYS = config('BOOK_CACHE_WARMUP_WINDOW_DAYS', default=7, cast=int)
+BOOK_CACHE_WARMUP_BATCH_SIZE = config('BOOK_CACHE_WARMUP_BATCH_SIZE', default=100, cast=int)
+BOOK_CACHE_WARMUP_TIME_BUDGET = config('BOOK_CACHE_WARMUP_TIME_BUDGET', default=5.0, cast=float)
+
+# Bloom filter over stored ISBNs, used to skip database probes for unknown ISBNs.
+# Every worker on the host maps the ISBN_FILTER_PATH file, so books stored by one
+# worker are seen by all. An empty path gives each process a private copy, which
+# misses books stored by other workers until they are looked up again. Run
+# build_isbn_filter (then restart workers) after imports that bypass Book.save().
+ISBN_FILTER_ENABLED = config('ISBN_FILTER_ENABLED', default=True, cast=bool)
+ISBN_FILTER_CAPACITY = config('ISBN_FILTER_CAPACITY', default=1000000, cast=int)
+ISBN_FILTER_ERROR_RATE = config('ISBN_FILTER_ERROR_RATE', default=0.01, cast=float)
+ISBN_FILTER_PATH = config('ISBN_FILTER_PATH', default=str(BASE_DIR / 'isbn_filter.bin'))
+
+# Local copy of the International ISBN Agency RangeMessage.xml
+# (https://www.isbn-international.org/range_file_generation), used for hyphenation
+ISBN_RANGE_MESSAGE_FILE = config('ISBN_RANGE_MESSAGE_FILE', default='')
+
+# Asynchronous lookup jobs (POST /api/books/search/ with "mode": "async").
+# Job state lives in the "jobs" cache, shared by the workers of one host; point it at
+# a network cache to run workers on several hosts. At most BOOK_JOB_MAX_PENDING jobs
+# are queued or running per process; further requests get a 503 until the backlog drains.
+BOOK_JOB_WORKERS = config('BOOK_JOB_WORKERS', default=4, cast=int)
+BOOK_JOB_MAX_PENDING = config('BOOK_JOB_MAX_PENDING', default=100, cast=int)
+BOOK_JOB_TTL = config('BOOK_JOB_TTL', default=600, cast=int)  # seconds
+# Job streams are closed after BOOK_JOB_STREAM_TIMEOUT and resumed by the client,
+# so each one holds a server thread only briefly (see the gthread workers in the Dockerfile)
+BOOK_JOB_STREAM_TIMEOUT = config('BOOK_JOB_STREAM_TIMEOUT', default=10, cast=int)  # seconds
+BOOK_JOB_STREAM_RETRY_MS = config('BOOK_JOB_STREAM_RETRY_MS', default=1000, cast=int)
+BOOK_JOB_STREAM_POLL_INTERVAL = config('BOOK_JOB_STREAM_POLL_INTERVAL', default=0.25, cast=float)
+
+GOOGLE_BOOKS_API_KEY = config('GOOGLE_BOOKS_API_KEY', default='')
+
+# Upstream book sources, overridable to point at local stubs (see replay_traffic)
+GOOGLE_BOOKS_API_URL = config('GOOGLE_BOOKS_API_URL', default='https://www.googleapis.com/books/v1/volumes')
+OPENLIBRARY_API_URL = config('OPENLIBRARY_API_URL', default='https://openlibrary.org/api/books')
+WORLDCAT_URL = config('WORLDCAT_URL', default='https://www.worldcat.org/isbn')
+
+# On-disk store of raw upstream responses, revalidated with ETag/Last-Modified and
+# replayed by reparse_upstream_responses. Every successful response is kept, also
+# those no book was found in; run prune_upstream_responses from cron to bound disk
+# use. Set UPSTREAM_STORE_DIR empty to disable.
+UPSTREAM_STORE_DIR = config('UPSTREAM_STORE_DIR', default=str(BASE_DIR / 'upstream_responses'))
+UPSTREAM_STORE_DEFAULT_MAX_AGE = config('UPSTREAM_STORE_DEFAULT_MAX_AGE', default=0, cast=int)  # seconds
+# prune_upstream_responses deletes entries not fetched or revalidated for this long
+UPSTREAM_STORE_RETENTION_DAYS = config('UPSTREAM_STORE_RETENTION_DAYS', default=90, cast=int)
+
+# SearchHistory retention: archive_search_history moves older rows to compressed files
+SEARCH_HISTORY_RETENTION_DAYS = config('SEARCH_HISTORY_RETENTION_DAYS', default=90, cast=int)
+SEARCH_HISTORY_ARCHIVE_DIR = config('SEARCH_HISTORY_ARCHIVE_DIR', default=str(BASE_DIR / 'search_history_archive'))
@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'book_search.settings')
 
 application = get_wsgi_application()
+
+# Only serving processes warm their cache, not manage.py commands
+from django.conf import settings  # noqa: E402
+
+if settings.BOOK_CACHE_WARMUP_ON_STARTUP:
+    from books.warmup import start_background_warmup
+
+    start_background_warmup()
@@ -0,0 +1,273 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Header of a persisted filter: magic, format version, number of bits, number of
+# hashes and a flag set once the filter holds every stored ISBN
+_HEADER = struct.Struct('<4sIQII')
+_HEADER_SIZE = 32
+_BUILT_OFFSET = 20
+_MAGIC = b'ISBF'
+_VERSION = 2
+
+
+class BloomFilter:
+    """
+    Compact set sketch answering "definitely absent" or "possibly present".
+
+    The bit array lives either in process memory or, when ``path`` is given, in a
+    shared memory-mapped file so that every worker on the host uses one copy.
+    Updates to a mapped filter hold an exclusive ``flock`` on the file, so
+    workers setting bits in the same byte never overwrite each other.
+    """
+
+    def __init__(self, capacity, error_rate, path=None):
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = None
+        self._mmap = None
+
+        num_bytes = (self.num_bits + 7) // 8
+        if path:
+            self._mmap = self._open_mapped(path, num_bytes)
+        if self._mmap is not None:
+            self._bits = memoryview(self._mmap)[_HEADER_SIZE:_HEADER_SIZE + num_bytes]
+        else:
+            self._bits = bytearray(num_bytes)
+
+    @property
+    def shared(self):
+        return self._mmap is not None
+
+    def _open_mapped(self, path, num_bytes):
+        """Map the filter file, creating it when needed. Returns None if it cannot be shared."""
+        fd = None
+        try:
+            import fcntl
+
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                size = os.fstat(fd).st_size
+                if size == 0:
+                    os.ftruncate(fd, _HEADER_SIZE + num_bytes)
+                    os.pwrite(fd, _HEADER.pack(_MAGIC, _VERSION, self.num_bits, self.num_hashes, 0), 0)
+                    compatible = True
+                else:
+                    header = _HEADER.unpack(os.pread(fd, _HEADER.size, 0))
+                    expected = (_MAGIC, _VERSION, self.num_bits, self.num_hashes)
+                    compatible = header[:4] == expected and size == _HEADER_SIZE + num_bytes
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+            if compatible:
+                mapped = mmap.mmap(fd, _HEADER_SIZE + num_bytes, mmap.MAP_SHARED)
+                self._fd = fd
+                return mapped
+            logger.warning(
+                f"ISBN filter file {path} was built with different parameters, "
+                "using a private in-memory filter instead"
+            )
+        except (OSError, ImportError) as e:
+            # Missing or read-only directory, or no fcntl (Windows)
+            logger.warning(
+                f"Could not share ISBN filter file {path}, "
+                f"using a private in-memory filter instead: {str(e)}"
+            )
+        if fd is not None:
+            os.close(fd)
+        return None
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add_many(self, items):
+        """Set the bits for every item under a single lock"""
+        positions = [pos for item in items for pos in self._positions(item)]
+        bits = self._bits
+        with self._lock:
+            if self._fd is None:
+                for pos in positions:
+                    bits[pos >> 3] |= 1 << (pos & 7)
+                return
+
+            import fcntl
+
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for pos in positions:
+                    bits[pos >> 3] |= 1 << (pos & 7)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def add(self, item):
+        self.add_many([item])
+
+    def __contains__(self, item):
+        bits = self._bits
+        for pos in self._positions(item):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def built(self):
+        """Whether a shared filter file already holds every stored ISBN"""
+        return self.shared and struct.unpack_from('<I', self._mmap, _BUILT_OFFSET)[0] == 1
+
+    def mark_built(self):
+        if self.shared:
+            struct.pack_into('<I', self._mmap, _BUILT_OFFSET, 1)
+            self._mmap.flush()
+
+    @property
+    def size_bytes(self):
+        return len(self._bits)
+
+    def estimated_error_rate(self, count):
+        """False positive probability once ``count`` items have been added"""
+        if not count:
+            return 0.0
+        return (1 - math.exp(-self.num_hashes * count / self.num_bits)) ** self.num_hashes
+
+
+class ISBNFilter:
+    """
+    Bloom filter over every ISBN, ISBN-10 and ISBN-13 stored in the Book table
+
+    Built lazily: the first might_contain() call starts a background build and,
+    until it has finished, every ISBN is reported as possibly present. With a
+    shared filter file only one worker on the host builds it, once; the others
+    pick it up as soon as the file is marked built.
+    """
+
+    def __init__(self, bloom):
+        self.bloom = bloom
+        self.ready = bloom.built
+        self.count = 0
+        self._building = False
+        self._build_lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(isbn):
+        return re.sub(r'[^0-9X]', '', isbn.upper())
+
+    def add(self, *isbns):
+        isbns = [self._normalize(isbn) for isbn in isbns if isbn]
+        self.bloom.add_many(isbns)
+        self.count += len(isbns)
+
+    def might_contain(self, isbn):
+        """False only when the ISBN is definitely not stored"""
+        if not self.ready:
+            if self.bloom.built:
+                self.ready = True
+            else:
+                self.build_in_background()
+                return True
+        return isbn in self.bloom
+
+    def build(self):
+        """Add every stored ISBN using a streaming query"""
+        from .models import Book
+
+        start_time = time.monotonic()
+        rows = Book.objects.values_list('isbn', 'isbn_10', 'isbn_13').iterator(chunk_size=2000)
+        chunk = []
+        for row in rows:
+            chunk.extend(row)
+            if len(chunk) >= 6000:
+                self.add(*chunk)
+                chunk = []
+        self.add(*chunk)
+        self.bloom.mark_built()
+        self.ready = True
+        logger.info(
+            f"ISBN filter built with {self.count} ISBNs in "
+            f"{int((time.monotonic() - start_time) * 1000)}ms "
+            f"({self.bloom.size_bytes} bytes, ~{self.bloom.estimated_error_rate(self.count):.4f} false positive rate)"
+        )
+
+    def build_in_background(self):
+        """Start a build unless one is running here, or in another worker on the file"""
+        with self._build_lock:
+            if self._building:
+                return
+            builder_fd = self._claim_shared_build()
+            if builder_fd is False:
+                return
+            self._building = True
+        threading.Thread(
+            target=self._build_safely, args=(builder_fd,), name='isbn-filter-build', daemon=True
+        ).start()
+
+    def _claim_shared_build(self):
+        """Lock file descriptor for the shared build, None if private, False if taken"""
+        if not self.bloom.shared:
+            return None
+
+        import fcntl
+
+        try:
+            fd = os.open(f"{self.bloom.path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            # Building without the lock only risks a duplicate build
+            logger.warning(f"Could not open the ISBN filter build lock: {str(e)}")
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        return fd
+
+    def _build_safely(self, builder_fd):
+        from django.db import connection
+
+        try:
+            if not self.bloom.built:
+                self.build()
+            self.ready = True
+        except Exception as e:
+            logger.error(f"ISBN filter build failed: {str(e)}")
+        finally:
+            connection.close()
+            if builder_fd is not None:
+                os.close(builder_fd)  # Releases the build lock
+            with self._build_lock:
+                self._building = False
+
+
+_isbn_filter = None
+_isbn_filter_lock = threading.Lock()
+
+
+def get_isbn_filter():
+    """Return the process-wide ISBN filter, or None when it is disabled"""
+    global _isbn_filter
+    if not getattr(settings, 'ISBN_FILTER_ENABLED', False):
+        return None
+    if _isbn_filter is None:
+        with _isbn_filter_lock:
+            if _isbn_filter is None:
+                _isbn_filter = ISBNFilter(BloomFilter(
+                    settings.ISBN_FILTER_CAPACITY,
+                    settings.ISBN_FILTER_ERROR_RATE,
+                    path=settings.ISBN_FILTER_PATH or None,
+                ))
+    return _isbn_filter
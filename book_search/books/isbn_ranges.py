@@ -0,0 +1,164 @@
+import logging
+import threading
+from array import array
+from bisect import bisect_right
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_POWERS_OF_TEN = tuple(10 ** i for i in range(10))
+
+
+class ISBNRangeInfo:
+    """Parts of an ISBN-13 as assigned by the International ISBN Agency"""
+
+    __slots__ = ('prefix', 'group', 'registrant', 'publication', 'check_digit', 'agency')
+
+    def __init__(self, prefix, group, registrant, publication, check_digit, agency):
+        self.prefix = prefix
+        self.group = group
+        self.registrant = registrant
+        self.publication = publication
+        self.check_digit = check_digit
+        self.agency = agency
+
+    @property
+    def hyphenated(self):
+        return f"{self.prefix}-{self.group}-{self.registrant}-{self.publication}-{self.check_digit}"
+
+    def as_dict(self):
+        return {
+            'hyphenated': self.hyphenated,
+            'prefix': self.prefix,
+            'registration_group': self.group,
+            'registrant': self.registrant,
+            'publication': self.publication,
+            'check_digit': self.check_digit,
+            'agency': self.agency,
+        }
+
+
+class _RuleTable:
+    """Sorted, non-overlapping ranges over the 7 digits that follow a prefix"""
+
+    __slots__ = ('starts', 'ends', 'lengths', 'agency')
+
+    def __init__(self, rules, agency):
+        rules.sort()
+        self.starts = array('l', (start for start, _, _ in rules))
+        self.ends = array('l', (end for _, end, _ in rules))
+        self.lengths = array('b', (length for _, _, length in rules))
+        self.agency = agency
+
+    def length_for(self, value):
+        """Length of the element starting at a 7-digit value, 0 if unassigned"""
+        i = bisect_right(self.starts, value) - 1
+        if i < 0 or value > self.ends[i]:
+            return 0
+        return self.lengths[i]
+
+
+class ISBNRangeIndex:
+    """
+    In-memory index compiled from the International ISBN Agency RangeMessage.xml.
+
+    Every lookup is two binary searches over packed arrays: one to find the
+    registration group length under the 978/979 prefix, one to find the
+    registrant length inside that group. Only the returned parts are allocated.
+    """
+
+    def __init__(self, prefixes, groups, serial=None, date=None):
+        self.prefixes = prefixes    # '978' -> _RuleTable of group lengths
+        self.groups = groups        # '9780' -> _RuleTable of registrant lengths
+        self.serial = serial
+        self.date = date
+
+    @classmethod
+    def from_file(cls, path):
+        import xml.etree.ElementTree as ET
+
+        root = ET.parse(path).getroot()
+
+        def tables(section, item_tag):
+            compiled = {}
+            for item in root.iterfind(f'{section}/{item_tag}'):
+                rules = []
+                for rule in item.iterfind('Rules/Rule'):
+                    start, end = rule.findtext('Range').split('-')
+                    rules.append((int(start), int(end), int(rule.findtext('Length'))))
+                prefix = item.findtext('Prefix').replace('-', '')
+                compiled[prefix] = _RuleTable(rules, item.findtext('Agency'))
+            return compiled
+
+        return cls(
+            tables('EAN.UCCPrefixes', 'EAN.UCC'),
+            tables('RegistrationGroups', 'Group'),
+            serial=root.findtext('MessageSerialNumber'),
+            date=root.findtext('MessageDate'),
+        )
+
+    def lookup(self, isbn13):
+        """Split a normalized ISBN-13 into its parts, or return None if unassigned"""
+        prefix_table = self.prefixes.get(isbn13[:3])
+        if prefix_table is None:
+            return None
+
+        # The 9 digits between the prefix and the check digit, as one integer
+        body = int(isbn13[3:12])
+        group_length = prefix_table.length_for(body // 100)
+        if not group_length:
+            return None
+        group_end = 3 + group_length
+        group_table = self.groups.get(isbn13[:group_end])
+        if group_table is None:
+            return None
+
+        # The digits after the group, cut or zero-padded to the 7 the rules cover
+        rest = body % _POWERS_OF_TEN[9 - group_length]
+        if group_length <= 2:
+            rest //= _POWERS_OF_TEN[2 - group_length]
+        else:
+            rest *= _POWERS_OF_TEN[group_length - 2]
+        registrant_length = group_table.length_for(rest)
+        if not registrant_length:
+            return None
+        registrant_end = group_end + registrant_length
+
+        return ISBNRangeInfo(
+            isbn13[:3],
+            isbn13[3:group_end],
+            isbn13[group_end:registrant_end],
+            isbn13[registrant_end:12],
+            isbn13[12],
+            group_table.agency,
+        )
+
+    def lookup_many(self, isbn13s):
+        """Bulk variant of lookup() for exports and batch jobs"""
+        lookup = self.lookup
+        return [lookup(isbn13) for isbn13 in isbn13s]
+
+
+_range_index = None
+_range_index_loaded = False
+_range_index_lock = threading.Lock()
+
+
+def get_range_index():
+    """Return the ISBN range index, or None when no RangeMessage.xml is configured"""
+    global _range_index, _range_index_loaded
+    if not _range_index_loaded:
+        with _range_index_lock:
+            if not _range_index_loaded:
+                path = getattr(settings, 'ISBN_RANGE_MESSAGE_FILE', '')
+                if path:
+                    from xml.etree.ElementTree import ParseError
+
+                    try:
+                        _range_index = ISBNRangeIndex.from_file(path)
+                    except (OSError, ParseError, ValueError, TypeError, AttributeError) as e:
+                        # Unreadable or malformed file: describe ISBNs without ranges
+                        logger.error(f"Could not load ISBN ranges from {path}: {str(e)}")
+                _range_index_loaded = True
+    return _range_index
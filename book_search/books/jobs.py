@@ -0,0 +1,125 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from .records import serialize_book
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+FINISHED_STATES = (DONE, FAILED)
+
+_executor = None
+_backlog = None
+_executor_lock = threading.Lock()
+
+
+class JobBacklogFull(Exception):
+    """Raised when BOOK_JOB_MAX_PENDING jobs are already queued or running"""
+
+
+def _get_executor():
+    global _executor, _backlog
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _backlog = threading.BoundedSemaphore(settings.BOOK_JOB_MAX_PENDING)
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.BOOK_JOB_WORKERS, thread_name_prefix='isbn-job'
+                )
+    return _executor
+
+
+def job_cache_key(job_id):
+    return f"isbn_job_{job_id}"
+
+
+def _save_job(job):
+    caches['jobs'].set(job_cache_key(job['id']), job, timeout=settings.BOOK_JOB_TTL)
+
+
+def get_job(job_id):
+    """Return the stored job state, or None if unknown or expired"""
+    return caches['jobs'].get(job_cache_key(job_id))
+
+
+def submit_lookup(service, isbn):
+    """
+    Queue an ISBN lookup through ``service`` and return the new job.
+
+    Raises JobBacklogFull once BOOK_JOB_MAX_PENDING jobs are queued or running.
+    """
+    executor = _get_executor()
+    if not _backlog.acquire(blocking=False):
+        raise JobBacklogFull()
+    job = {
+        'id': uuid.uuid4().hex,
+        'isbn': isbn,
+        'status': PENDING,
+        'created_at': time.time(),
+        'finished_at': None,
+        'result': None,
+    }
+    _save_job(job)
+    try:
+        executor.submit(_run_lookup, service, dict(job))
+    except RuntimeError:
+        _backlog.release()
+        raise
+    return job
+
+
+def _run_lookup(service, job):
+    try:
+        # Nobody can read the result of a job that expired while queued
+        if get_job(job['id']) is None:
+            logger.warning(f"Lookup job {job['id']} expired before it ran")
+            return
+        _lookup(service, job)
+    finally:
+        _backlog.release()
+
+
+def _lookup(service, job):
+    start_time = time.time()
+    job['status'] = RUNNING
+    _save_job(job)
+
+    try:
+        book, error_message = service.search_book(job['isbn'])
+        search_time_ms = int((time.time() - start_time) * 1000)
+        if book:
+            job['result'] = {
+                'success': True,
+                'data': dict(serialize_book(book)),
+                'search_time_ms': search_time_ms,
+                'message': 'Book found successfully'
+            }
+        else:
+            job['result'] = {
+                'success': False,
+                'message': error_message or 'Book not found',
+                'search_time_ms': search_time_ms
+            }
+        job['status'] = DONE
+    except Exception as e:
+        logger.error(f"Lookup job {job['id']} failed: {str(e)}")
+        job['result'] = {
+            'success': False,
+            'message': 'Lookup failed'
+        }
+        job['status'] = FAILED
+    finally:
+        connection.close()
+
+    job['finished_at'] = time.time()
+    _save_job(job)
@@ -0,0 +1,271 @@
+"""
+Traffic replay for sizing workers and comparing lookup pipeline changes.
+
+Workloads come from SearchHistory or a synthetic Zipf distribution and are
+replayed open-loop against a running API. Local stub upstreams stand in for
+Google Books, Open Library and WorldCat so runs never touch the real sources.
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import SearchHistory
+
+ENDPOINTS = {
+    'search': ('POST', '/api/books/search/'),
+    'validate': ('POST', '/api/books/validate/'),
+    'detail': ('GET', '/api/books/{isbn}/'),
+}
+
+
+def _isbn13_from_number(number):
+    body = f"978{number % 10 ** 9:09d}"
+    check = sum(int(char) * (3 if i % 2 else 1) for i, char in enumerate(body))
+    return body + str((10 - check % 10) % 10)
+
+
+def zipf_workload(count, distinct, exponent, seed=0):
+    """ISBNs drawn from a Zipf distribution over ``distinct`` synthetic ISBNs"""
+    rng = random.Random(seed)
+    isbns = [_isbn13_from_number(rng.randrange(10 ** 9)) for _ in range(distinct)]
+    weights = [1 / rank ** exponent for rank in range(1, distinct + 1)]
+    return rng.choices(isbns, weights=weights, k=count)
+
+
+def history_workload(count, window_days, seed=0):
+    """ISBNs sampled with the frequencies recorded in SearchHistory"""
+    since = timezone.now() - timedelta(days=window_days)
+    rows = list(
+        SearchHistory.objects
+        .filter(search_time__gte=since)
+        .values('isbn')
+        .annotate(hits=Count('id'))
+    )
+    if not rows:
+        return []
+    rng = random.Random(seed)
+    return rng.choices(
+        [row['isbn'] for row in rows], weights=[row['hits'] for row in rows], k=count
+    )
+
+
+def assign_endpoints(isbns, mix, seed=0):
+    """Pair every ISBN with an endpoint name picked by the ``mix`` weights"""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    return list(zip(rng.choices(names, weights=weights, k=len(isbns)), isbns))
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarize(latencies, errors, statuses):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'error_rate': round(errors / count * 100, 2) if count else 0.0,
+        'statuses': dict(sorted(statuses.items())),
+        'latency_ms': {
+            'mean': round(sum(latencies) / count, 2) if count else 0.0,
+            'p50': round(_percentile(latencies, 0.50), 2),
+            'p90': round(_percentile(latencies, 0.90), 2),
+            'p99': round(_percentile(latencies, 0.99), 2),
+            'max': round(latencies[-1], 2) if count else 0.0,
+        },
+    }
+
+
+def replay(target, workload, rate, concurrency, timeout=30):
+    """
+    Send ``workload`` ((endpoint, isbn) pairs) to ``target`` at ``rate`` requests/s.
+
+    Requests are scheduled open-loop and latency is measured from each request's
+    scheduled start, so a saturated server shows up as growing latency instead
+    of a silently lower send rate. Returns the report dict.
+    """
+    import requests
+
+    local = threading.local()
+    lock = threading.Lock()
+    results = {name: {'latencies': [], 'errors': 0, 'statuses': {}} for name in ENDPOINTS}
+    target = target.rstrip('/')
+    start = time.perf_counter()
+
+    def send(index, endpoint, isbn):
+        scheduled = start + index / rate
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+
+        method, path = ENDPOINTS[endpoint]
+        url = target + path.format(isbn=isbn)
+        try:
+            if method == 'POST':
+                response = session.post(url, json={'isbn': isbn}, timeout=timeout)
+            else:
+                response = session.get(url, timeout=timeout)
+            status_code = str(response.status_code)
+            failed = response.status_code >= 500
+        except requests.RequestException as e:
+            status_code = type(e).__name__
+            failed = True
+        latency_ms = (time.perf_counter() - scheduled) * 1000
+
+        with lock:
+            result = results[endpoint]
+            result['latencies'].append(latency_ms)
+            result['statuses'][status_code] = result['statuses'].get(status_code, 0) + 1
+            if failed:
+                result['errors'] += 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, (endpoint, isbn) in enumerate(workload):
+            executor.submit(send, index, endpoint, isbn)
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [latency for result in results.values() for latency in result['latencies']]
+    all_statuses = {}
+    for result in results.values():
+        for status_code, hits in result['statuses'].items():
+            all_statuses[status_code] = all_statuses.get(status_code, 0) + hits
+
+    return {
+        'target': target,
+        'rate': rate,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'throughput': round(len(workload) / elapsed, 2) if elapsed else 0.0,
+        'overall': _summarize(all_latencies, sum(r['errors'] for r in results.values()), all_statuses),
+        'endpoints': {
+            name: _summarize(result['latencies'], result['errors'], result['statuses'])
+            for name, result in results.items() if result['latencies']
+        },
+    }
+
+
+def compare_reports(baseline, current):
+    """Rows of (scope, metric, baseline, current, change %) for two reports"""
+    rows = []
+    scopes = [('overall', baseline.get('overall'), current.get('overall'))]
+    for name, stats in current.get('endpoints', {}).items():
+        scopes.append((name, baseline.get('endpoints', {}).get(name), stats))
+
+    for scope, before, after in scopes:
+        if not before or not after:
+            continue
+        metrics = [('error_rate', before['error_rate'], after['error_rate'])]
+        for key in ('p50', 'p90', 'p99'):
+            metrics.append((key, before['latency_ms'][key], after['latency_ms'][key]))
+        for metric, old, new in metrics:
+            change = (new - old) / old * 100 if old else 0.0
+            rows.append((scope, metric, old, new, round(change, 1)))
+    return rows
+
+
+class _StubUpstreamHandler(BaseHTTPRequestHandler):
+    """Answers like Google Books, Open Library and WorldCat for known ISBNs"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _is_known(self, isbn):
+        return zlib.crc32(isbn.encode()) % 1000 < self.server.hit_rate * 1000
+
+    def _send(self, status, body, content_type='application/json'):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+
+        if parsed.path == '/books/v1/volumes':
+            isbn = query.get('q', [''])[0].replace('isbn:', '')
+            if not self._is_known(isbn):
+                return self._send(200, json.dumps({'totalItems': 0}))
+            return self._send(200, json.dumps({'totalItems': 1, 'items': [{'volumeInfo': {
+                'title': f"Stub Book {isbn}",
+                'authors': ['Stub Author'],
+                'industryIdentifiers': [{'type': 'ISBN_13', 'identifier': isbn}],
+                'publisher': 'Stub Press',
+                'pageCount': 100,
+            }}]}))
+
+        if parsed.path == '/api/books':
+            bibkey = query.get('bibkeys', [''])[0]
+            isbn = bibkey.replace('ISBN:', '')
+            if not self._is_known(isbn):
+                return self._send(200, '{}')
+            return self._send(200, json.dumps({bibkey: {
+                'title': f"Stub Book {isbn}",
+                'authors': [{'name': 'Stub Author'}],
+                'publishers': [{'name': 'Stub Press'}],
+            }}))
+
+        if parsed.path.startswith('/isbn/'):
+            return self._send(404, 'Not found', 'text/html')
+
+        self._send(404, '{}')
+
+
+class StubUpstreamServer:
+    """Local HTTP server impersonating every upstream source"""
+
+    def __init__(self, port, latency_ms=0, hit_rate=0.5):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), _StubUpstreamHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency_ms / 1000
+        self.httpd.hit_rate = hit_rate
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self):
+        """Settings to start the API under test with so it uses these stubs"""
+        return {
+            'GOOGLE_BOOKS_API_URL': f"{self.base_url}/books/v1/volumes",
+            'OPENLIBRARY_API_URL': f"{self.base_url}/api/books",
+            'WORLDCAT_URL': f"{self.base_url}/isbn",
+            # Any key, so Google Books is not skipped as unconfigured
+            'GOOGLE_BOOKS_API_KEY': 'stub',
+            # Keep stub payloads out of the raw response store
+            'UPSTREAM_STORE_DIR': '',
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='stub-upstreams', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
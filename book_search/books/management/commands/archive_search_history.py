@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books.retention import PERIOD_FORMATS, archive_search_history, compact_archives
+
+
+class Command(BaseCommand):
+    help = (
+        "Move SearchHistory rows older than the retention window into compressed "
+        "per-period archive files, deleting them in small batches. Meant to run on a "
+        "schedule, e.g. daily from cron: manage.py archive_search_history --compact"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SEARCH_HISTORY_RETENTION_DAYS,
+            help='Keep this many days of history in the database'
+        )
+        parser.add_argument(
+            '--period', choices=list(PERIOD_FORMATS), default='month',
+            help='Archive file granularity'
+        )
+        parser.add_argument(
+            '--archive-dir', default=settings.SEARCH_HISTORY_ARCHIVE_DIR,
+            help='Directory holding the archive files'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows archived and deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches')
+        parser.add_argument(
+            '--compact', action='store_true',
+            help='Afterwards, rewrite the archives appended to as one deduplicated gzip member each'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived')
+
+    def handle(self, *args, **options):
+        archived = archive_search_history(
+            options['archive_dir'],
+            options['days'],
+            period=options['period'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            dry_run=options['dry_run'],
+        )
+
+        for period_key, count in sorted(archived.items()):
+            self.stdout.write(f"  {period_key}: {count} rows")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would archive' if options['dry_run'] else 'Archived'} {sum(archived.values())} "
+            f"rows older than {options['days']} days into {options['archive_dir']}"
+        ))
+
+        if options['compact'] and not options['dry_run']:
+            compacted = compact_archives(options['archive_dir'], periods=set(archived))
+            for period_key, (before, after) in sorted(compacted.items()):
+                if before != after:
+                    self.stdout.write(f"  compacted {period_key}: {before} -> {after} rows")
+            self.stdout.write(self.style.SUCCESS("Archives compacted"))
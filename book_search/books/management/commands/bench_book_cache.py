@@ -0,0 +1,87 @@
+import pickle
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from books.models import Book
+from books.records import BookRecord, encode_book
+from books.serializers import BookSerializer
+
+
+def _sample_book():
+    now = timezone.now()
+    return Book(
+        id=1,
+        isbn='9780134685991',
+        isbn_10='0134685997',
+        isbn_13='9780134685991',
+        title='Effective Java',
+        subtitle='Third Edition',
+        authors=['Joshua Bloch'],
+        publisher='Addison-Wesley Professional',
+        published_date='2017-12-18',
+        description='The Definitive Guide to Java Platform Best Practices. ' * 10,
+        page_count=412,
+        categories=['Computers'],
+        language='en',
+        thumbnail='http://books.google.com/books/content?id=ka2VUBqHiWkC&printsec=frontcover&img=1&zoom=1',
+        small_thumbnail='http://books.google.com/books/content?id=ka2VUBqHiWkC&printsec=frontcover&img=1&zoom=5',
+        preview_link='http://books.google.com/books?id=ka2VUBqHiWkC&dq=isbn:9780134685991',
+        info_link='http://books.google.com/books?id=ka2VUBqHiWkC&dq=isbn:9780134685991',
+        average_rating=4.5,
+        ratings_count=120,
+        maturity_rating='NOT_MATURE',
+        data_source='Google Books',
+        created_at=now,
+        updated_at=now,
+    )
+
+
+class Command(BaseCommand):
+    help = "Compare caching pickled Book instances against compact BookRecord tuples"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000, help='Round trips per variant')
+        parser.add_argument(
+            '--from-db', action='store_true',
+            help='Use the most recent stored book instead of a synthetic one'
+        )
+
+    def _time(self, label, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"  {label:<44} {elapsed / iterations * 1e6:8.2f}us")
+
+    def handle(self, *args, **options):
+        book = _sample_book()
+        if options['from_db']:
+            book = Book.objects.first() or book
+        iterations = options['iterations']
+        protocol = pickle.HIGHEST_PROTOCOL  # What LocMemCache uses
+
+        pickled_model = pickle.dumps(book, protocol)
+        pickled_record = pickle.dumps(encode_book(book), protocol)
+
+        self.stdout.write("Memory per cache entry (pickled value as LocMemCache stores it):")
+        self.stdout.write(f"  {'Book model instance':<44} {sys.getsizeof(pickled_model):8d} bytes")
+        self.stdout.write(f"  {'BookRecord tuple':<44} {sys.getsizeof(pickled_record):8d} bytes")
+
+        self.stdout.write(f"Per-entry time over {iterations} iterations:")
+        self._time('encode: pickle Book', lambda: pickle.dumps(book, protocol), iterations)
+        self._time('encode: encode_book + pickle', lambda: pickle.dumps(encode_book(book), protocol), iterations)
+        self._time('decode: unpickle Book', lambda: pickle.loads(pickled_model), iterations)
+        self._time('decode: unpickle + BookRecord.decode', lambda: BookRecord.decode(pickle.loads(pickled_record)), iterations)
+        self._time(
+            'cache hit to response data: Book + serializer',
+            lambda: BookSerializer(pickle.loads(pickled_model)).data,
+            iterations
+        )
+        self._time(
+            'cache hit to response data: BookRecord',
+            lambda: BookRecord.decode(pickle.loads(pickled_record)).as_dict(),
+            iterations
+        )
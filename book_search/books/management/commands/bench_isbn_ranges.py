@@ -0,0 +1,56 @@
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books.isbn_ranges import ISBNRangeIndex
+
+
+def _random_isbn13(rng):
+    body = rng.choice(('978', '979')) + ''.join(rng.choice('0123456789') for _ in range(9))
+    check = sum(int(char) * (3 if i % 2 else 1) for i, char in enumerate(body))
+    return body + str((10 - check % 10) % 10)
+
+
+class Command(BaseCommand):
+    help = "Benchmark compiling the ISBN range index and hyphenating ISBNs in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=settings.ISBN_RANGE_MESSAGE_FILE,
+            help='RangeMessage.xml to compile (defaults to ISBN_RANGE_MESSAGE_FILE)'
+        )
+        parser.add_argument('--count', type=int, default=100000, help='ISBNs per round')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for the generated ISBNs')
+
+    def handle(self, *args, **options):
+        if not options['file']:
+            raise CommandError("No RangeMessage.xml configured, set ISBN_RANGE_MESSAGE_FILE or pass --file")
+
+        start = time.perf_counter()
+        index = ISBNRangeIndex.from_file(options['file'])
+        compile_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(
+            f"Compiled range message {index.serial or '?'} ({index.date or 'undated'}): "
+            f"{len(index.prefixes)} prefixes, {len(index.groups)} groups in {compile_ms:.1f}ms"
+        )
+
+        rng = random.Random(options['seed'])
+        isbns = [_random_isbn13(rng) for _ in range(options['count'])]
+
+        timings = []
+        for _ in range(options['rounds']):
+            start = time.perf_counter()
+            results = index.lookup_many(isbns)
+            timings.append(time.perf_counter() - start)
+
+        best = min(timings)
+        assigned = sum(1 for result in results if result is not None)
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['count']} lookups x {options['rounds']} rounds: "
+            f"best {best * 1000:.1f}ms ({best / options['count'] * 1e9:.0f}ns/ISBN, "
+            f"{options['count'] / best:,.0f} ISBNs/s), "
+            f"{assigned / options['count'] * 100:.1f}% in assigned ranges"
+        ))
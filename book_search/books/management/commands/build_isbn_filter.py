@@ -0,0 +1,43 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books.isbn_filter import BloomFilter, ISBNFilter
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the memory-mapped ISBN filter file from the Book table. "
+        "Running workers keep their current copy until restarted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=settings.ISBN_FILTER_PATH,
+            help='Filter file to write (defaults to ISBN_FILTER_PATH)'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path:
+            raise CommandError("No filter file configured, set ISBN_FILTER_PATH or pass --path")
+
+        tmp_path = f"{path}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        isbn_filter = ISBNFilter(BloomFilter(
+            settings.ISBN_FILTER_CAPACITY,
+            settings.ISBN_FILTER_ERROR_RATE,
+            path=tmp_path,
+        ))
+        if not isbn_filter.bloom.shared:
+            raise CommandError(f"Could not create the filter file {tmp_path}, see the warning above")
+        isbn_filter.build()
+        os.replace(tmp_path, path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {path}: {isbn_filter.count} ISBNs, {isbn_filter.bloom.size_bytes} bytes, "
+            f"~{isbn_filter.bloom.estimated_error_rate(isbn_filter.count):.4f} false positive rate"
+        ))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books.services import ISBNService
+from books.upstream_store import get_upstream_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete raw upstream responses that have not been fetched or revalidated "
+        "within the retention window. Meant to run on a schedule, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.UPSTREAM_STORE_RETENTION_DAYS,
+            help='Keep responses fetched or revalidated within this many days'
+        )
+        parser.add_argument(
+            '--source', choices=ISBNService.SOURCE_NAMES,
+            help='Only prune responses from this source'
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+
+    def handle(self, *args, **options):
+        store = get_upstream_store()
+        if store is None:
+            raise CommandError("UPSTREAM_STORE_DIR is not configured")
+
+        pruned = store.prune(options['days'], source=options['source'], dry_run=options['dry_run'])
+        for source, (removed, freed) in sorted(pruned.items()):
+            self.stdout.write(f"  {source}: {removed} responses, {freed} bytes")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would delete' if options['dry_run'] else 'Deleted'} "
+            f"{sum(removed for removed, _ in pruned.values())} responses older than "
+            f"{options['days']} days from {store.root}"
+        ))
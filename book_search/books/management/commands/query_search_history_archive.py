@@ -0,0 +1,70 @@
+import argparse
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books.retention import archive_files, parse_period_date, read_archives
+
+
+def _period_date(value):
+    """argparse type for --since/--until, reporting bad dates as usage errors"""
+    try:
+        return parse_period_date(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+class Command(BaseCommand):
+    help = "Read archived SearchHistory rows back, filtered by period, ISBN and outcome"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--archive-dir', default=settings.SEARCH_HISTORY_ARCHIVE_DIR,
+            help='Directory holding the archive files'
+        )
+        parser.add_argument('--since', type=_period_date, help='First day to include (YYYY-MM-DD or YYYY-MM)')
+        parser.add_argument('--until', type=_period_date, help='First day to exclude (YYYY-MM-DD or YYYY-MM)')
+        parser.add_argument('--isbn', help='Only searches for this ISBN')
+        outcome = parser.add_mutually_exclusive_group()
+        outcome.add_argument('--found', dest='found', action='store_const', const=True, help='Only successful searches')
+        outcome.add_argument('--not-found', dest='found', action='store_const', const=False, help='Only failed searches')
+        parser.add_argument('--limit', type=int, default=100, help='Rows to print, 0 for all')
+        parser.add_argument('--stats', action='store_true', help='Print aggregate stats instead of rows')
+        parser.add_argument('--list', action='store_true', help='List the archive files')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for period_key, path in archive_files(options['archive_dir']):
+                self.stdout.write(f"{period_key}  {path.stat().st_size:>10} bytes  {path}")
+            return
+
+        rows = read_archives(
+            options['archive_dir'],
+            since=options['since'],
+            until=options['until'],
+            isbn=options['isbn'],
+            found=options['found'],
+        )
+
+        if options['stats']:
+            total = successful = timed = 0
+            total_time = 0
+            for row in rows:
+                total += 1
+                successful += row['found']
+                if row['response_time_ms'] is not None:
+                    timed += 1
+                    total_time += row['response_time_ms']
+            self.stdout.write(json.dumps({
+                'total_searches': total,
+                'successful_searches': successful,
+                'success_rate': round(successful / total * 100, 2) if total else 0,
+                'average_response_time_ms': round(total_time / timed, 2) if timed else 0,
+            }))
+            return
+
+        for printed, row in enumerate(rows):
+            if options['limit'] and printed >= options['limit']:
+                break
+            self.stdout.write(json.dumps(row))
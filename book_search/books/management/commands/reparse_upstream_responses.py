@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from books.models import Book
+from books.services import ISBNService, book_cache_key
+from books.upstream_store import get_upstream_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild Book rows from the raw upstream responses on disk, without any "
+        "network access. Use after fixing a parser."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', choices=ISBNService.SOURCE_NAMES,
+            help='Only reparse responses from this source'
+        )
+        parser.add_argument('--isbn', action='append', help='Only reparse this ISBN (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Parse but do not save')
+
+    def handle(self, *args, **options):
+        store = get_upstream_store()
+        if store is None:
+            raise CommandError("UPSTREAM_STORE_DIR is not configured")
+
+        service = ISBNService()
+        isbns = set(options['isbn'] or [])
+
+        # ISBN -> {source: payload}, so each book is rebuilt from its best source
+        payloads = {}
+        for source, isbn, content in store.entries(options['source']):
+            if not isbns or isbn in isbns:
+                payloads.setdefault(isbn, {})[source] = content
+
+        created = updated = unparsed = failed = 0
+        for isbn, by_source in payloads.items():
+            book_data = None
+            for source in ISBNService.SOURCE_NAMES:
+                if source not in by_source:
+                    continue
+                try:
+                    book_data = service.parse_stored_response(source, isbn, by_source[source])
+                except Exception as e:
+                    self.stderr.write(f"{isbn} ({source}): {str(e)}")
+                    failed += 1
+                if book_data:
+                    break
+
+            if not book_data:
+                unparsed += 1
+                continue
+            if options['dry_run']:
+                continue
+
+            _, was_created = Book.objects.update_or_create(isbn=isbn, defaults=book_data)
+            cache.delete(book_cache_key(isbn))
+            if was_created:
+                created += 1
+            else:
+                updated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Reparsed {len(payloads)} ISBNs: {created} created, {updated} updated, "
+            f"{unparsed} without book data, {failed} parse errors"
+            + (" (dry run)" if options['dry_run'] else "")
+        ))
@@ -0,0 +1,153 @@
+import argparse
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.loadgen import (
+    ENDPOINTS,
+    StubUpstreamServer,
+    assign_endpoints,
+    compare_reports,
+    history_workload,
+    replay,
+    zipf_workload,
+)
+
+
+def _parse_mix(value):
+    """argparse type for --mix, reporting bad weights as usage errors"""
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown endpoint '{name}', expected one of {', '.join(ENDPOINTS)}"
+            )
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight '{weight}' for {name}")
+        if mix[name] < 0:
+            raise argparse.ArgumentTypeError(f"Weight for {name} must not be negative")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("At least one endpoint needs a positive weight")
+    return mix
+
+
+def _positive_float(value):
+    """argparse type for rates, which replay() divides by"""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a number, got '{value}'")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"Must be greater than 0, got {value}")
+    return number
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a SearchHistory-derived or synthetic Zipf workload against a running API "
+        "and report latency distributions and error rates per endpoint. With --stub-port, "
+        "local stub upstreams are served for the duration; start the API with the printed "
+        "environment so it never reaches the real sources."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', default='http://127.0.0.1:8000', help='Base URL of the API under test')
+        parser.add_argument('--source', choices=['history', 'zipf'], default='history', help='Where ISBNs come from')
+        parser.add_argument('--requests', type=int, default=1000, help='Number of requests to send')
+        parser.add_argument('--rate', type=_positive_float, default=50, help='Requests per second')
+        parser.add_argument('--concurrency', type=int, default=16, help='Maximum requests in flight')
+        parser.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+        parser.add_argument(
+            '--mix', type=_parse_mix, default={'search': 8, 'detail': 1, 'validate': 1},
+            help='Endpoint weights, e.g. search=8,detail=1,validate=1'
+        )
+        parser.add_argument('--days', type=int, default=30, help='SearchHistory window for --source history')
+        parser.add_argument('--distinct', type=int, default=5000, help='Distinct ISBNs for --source zipf')
+        parser.add_argument('--zipf-exponent', type=float, default=1.1, help='Skew for --source zipf')
+        parser.add_argument('--seed', type=int, default=0, help='Seed so runs replay the same workload')
+        parser.add_argument('--stub-port', type=int, help='Serve stub upstreams on this port')
+        parser.add_argument('--stub-latency-ms', type=float, default=50, help='Added latency of stub upstreams')
+        parser.add_argument('--stub-hit-rate', type=float, default=0.5, help='Share of ISBNs the stubs know')
+        parser.add_argument(
+            '--stubs-only', action='store_true',
+            help='Only serve the stub upstreams until interrupted'
+        )
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='Earlier JSON report to compare against')
+
+    def handle(self, *args, **options):
+        stubs = None
+        if options['stub_port'] is not None:
+            stubs = StubUpstreamServer(
+                options['stub_port'], options['stub_latency_ms'], options['stub_hit_rate']
+            )
+            stubs.start()
+            self.stdout.write(f"Stub upstreams on {stubs.base_url}, start the API with:")
+            for name, value in stubs.environment().items():
+                self.stdout.write(f"  {name}={value}")
+        elif options['stubs_only']:
+            raise CommandError("--stubs-only needs --stub-port")
+
+        try:
+            if options['stubs_only']:
+                while True:
+                    time.sleep(3600)
+            self._run(options)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if stubs:
+                stubs.stop()
+
+    def _run(self, options):
+        if options['source'] == 'history':
+            isbns = history_workload(options['requests'], options['days'], options['seed'])
+            if not isbns:
+                raise CommandError("No SearchHistory in the window, use --source zipf")
+        else:
+            isbns = zipf_workload(
+                options['requests'], options['distinct'], options['zipf_exponent'], options['seed']
+            )
+        workload = assign_endpoints(isbns, options['mix'], options['seed'])
+
+        self.stdout.write(
+            f"Replaying {len(workload)} requests ({options['source']}) against {options['target']} "
+            f"at {options['rate']}/s with concurrency {options['concurrency']}"
+        )
+        report = replay(
+            options['target'], workload, options['rate'], options['concurrency'], options['timeout']
+        )
+        report['workload'] = {
+            'source': options['source'],
+            'requests': len(workload),
+            'distinct_isbns': len(set(isbns)),
+            'mix': options['mix'],
+            'seed': options['seed'],
+        }
+
+        self.stdout.write(f"Done in {report['duration_s']}s, {report['throughput']} requests/s")
+        self.stdout.write(f"{'endpoint':<10} {'requests':>8} {'errors':>7} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+        rows = [('overall', report['overall'])] + list(report['endpoints'].items())
+        for name, stats in rows:
+            latency = stats['latency_ms']
+            self.stdout.write(
+                f"{name:<10} {stats['requests']:>8} {stats['error_rate']:>6}% "
+                f"{latency['p50']:>7}ms {latency['p90']:>7}ms {latency['p99']:>7}ms {latency['max']:>7}ms"
+            )
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            self.stdout.write(f"Compared with {options['compare']}:")
+            for scope, metric, old, new, change in compare_reports(baseline, report):
+                self.stdout.write(f"  {scope:<10} {metric:<10} {old:>9} -> {new:>9} ({change:+}%)")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
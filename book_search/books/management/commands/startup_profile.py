@@ -0,0 +1,122 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter: boots the WSGI application the way gunicorn does
+# and serves one request, reporting how long each phase took.
+_CHILD_SCRIPT = '''
+import io, json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+setup_done = time.perf_counter()
+
+method, path, body, host = sys.argv[1:5]
+environ = {
+    'REQUEST_METHOD': method, 'PATH_INFO': path, 'QUERY_STRING': '',
+    'SERVER_NAME': host, 'SERVER_PORT': '80', 'HTTP_HOST': host,
+    'CONTENT_TYPE': 'application/json', 'CONTENT_LENGTH': str(len(body)),
+    'wsgi.input': io.BytesIO(body.encode()), 'wsgi.errors': sys.stderr,
+    'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0), 'wsgi.multithread': True,
+    'wsgi.multiprocess': True, 'wsgi.run_once': False, 'SERVER_PROTOCOL': 'HTTP/1.1',
+}
+statuses = []
+b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+first_response = time.perf_counter()
+heavy = [name for name in ('requests', 'bs4', 'decouple', 'xml.etree.ElementTree') if name in sys.modules]
+print(json.dumps({
+    'finished_at': time.time(),
+    'status': statuses[0],
+    'setup_ms': (setup_done - started) * 1000,
+    'first_request_ms': (first_response - setup_done) * 1000,
+    'modules': len(sys.modules),
+    'heavy_modules': heavy,
+}))
+'''
+
+_TARGETS = {
+    'health': ('GET', '/api/health/', ''),
+    'validate': ('POST', '/api/books/validate/', '{"isbn": "9780134685991"}'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold start: spawn fresh interpreters, boot the WSGI application and "
+        "time the first response, then report the slowest imports from -X importtime."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts per endpoint')
+        parser.add_argument(
+            '--endpoint', action='append', choices=list(_TARGETS),
+            help='Endpoint to time (repeatable, defaults to all)'
+        )
+        parser.add_argument('--top', type=int, default=20, help='Imports to list in the report')
+        parser.add_argument('--no-imports', action='store_true', help='Skip the import-time report')
+
+    def _spawn(self, target, importtime=False):
+        method, path, body = _TARGETS[target]
+        host = next((h for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', _CHILD_SCRIPT, method, path, body, host]
+
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        spawned_at = time.time()
+        result = subprocess.run(
+            command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Cold start for {target} failed:\n{result.stderr}")
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        report['total_ms'] = (report['finished_at'] - spawned_at) * 1000
+        return report, result.stderr
+
+    def handle(self, *args, **options):
+        targets = options['endpoint'] or list(_TARGETS)
+
+        self.stdout.write(f"Time to first response over {options['runs']} cold start(s), median:")
+        self.stdout.write(f"  {'endpoint':<10} {'status':<16} {'total':>9} {'setup':>9} {'request':>9} {'modules':>8}")
+        for target in targets:
+            runs = [self._spawn(target)[0] for _ in range(options['runs'])]
+            last = runs[-1]
+            self.stdout.write(
+                f"  {target:<10} {last['status']:<16} "
+                f"{statistics.median(r['total_ms'] for r in runs):>7.1f}ms "
+                f"{statistics.median(r['setup_ms'] for r in runs):>7.1f}ms "
+                f"{statistics.median(r['first_request_ms'] for r in runs):>7.1f}ms "
+                f"{last['modules']:>8}"
+            )
+            if last['heavy_modules']:
+                self.stdout.write(f"    heavy modules loaded: {', '.join(last['heavy_modules'])}")
+
+        if options['no_imports']:
+            return
+
+        _, stderr = self._spawn(targets[0], importtime=True)
+        imports = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip()) - 1) // 2
+            imports.append((int(cumulative_us), int(self_us), depth, name.strip()))
+
+        self.stdout.write(f"Slowest imports on the {targets[0]} path (cumulative, top-level packages):")
+        top_level = sorted((i for i in imports if i[2] == 0), reverse=True)[:options['top']]
+        for cumulative_us, self_us, _, name in top_level:
+            self.stdout.write(f"  {cumulative_us / 1000:>8.1f}ms  {name}")
+
+        self.stdout.write("Slowest individual modules (self time):")
+        for cumulative_us, self_us, _, name in sorted(imports, key=lambda i: i[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {self_us / 1000:>8.1f}ms  {name}")
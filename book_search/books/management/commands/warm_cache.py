@@ -0,0 +1,63 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from books.warmup import warm_cache
+
+# Backends whose entries only live in the process that wrote them
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-load the most searched books from SearchHistory into the cache. "
+        "Only useful with a cache backend shared between processes; the "
+        "per-process LocMemCache is warmed by BOOK_CACHE_WARMUP_ON_STARTUP instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=settings.BOOK_CACHE_WARMUP_LIMIT,
+            help='Number of most popular ISBNs to load'
+        )
+        parser.add_argument(
+            '--days', type=int, default=settings.BOOK_CACHE_WARMUP_WINDOW_DAYS,
+            help='Rank ISBNs by searches made in this many recent days'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.BOOK_CACHE_WARMUP_BATCH_SIZE,
+            help='Books loaded from the database per query'
+        )
+        parser.add_argument(
+            '--time-budget', type=float, default=settings.BOOK_CACHE_WARMUP_TIME_BUDGET,
+            help='Stop after this many seconds'
+        )
+        parser.add_argument(
+            '--json', action='store_true',
+            help='Print the warm-up report as JSON'
+        )
+
+    def handle(self, *args, **options):
+        backend = settings.CACHES['default']['BACKEND']
+        if backend in PROCESS_LOCAL_BACKENDS:
+            raise CommandError(
+                f"The default cache ({backend}) is not shared between processes, so "
+                "warming it from this command would not reach the web workers. Use "
+                "BOOK_CACHE_WARMUP_ON_STARTUP=True or configure a shared cache backend."
+            )
+
+        report = warm_cache(
+            limit=options['limit'],
+            window_days=options['days'],
+            batch_size=options['batch_size'],
+            time_budget=options['time_budget'],
+        )
+
+        if options['json']:
+            self.stdout.write(json.dumps(report.as_dict()))
+        else:
+            self.stdout.write(self.style.SUCCESS(str(report)))
@@ -45,6 +45,13 @@ class SearchHistory(models.Model):
     class Meta:
         ordering = ['-search_time']
         verbose_name_plural = "Search histories"
+        indexes = [
+            # Popularity ranking over a time window (cache warm-up, traffic replay);
+            # its search_time prefix also serves recent-first listings and the retention cutoff
+            models.Index(fields=['search_time', 'found', 'isbn'], name='search_history_window_idx'),
+            # History of a single ISBN
+            models.Index(fields=['isbn', 'search_time'], name='search_history_isbn_idx'),
+        ]
     
     def __str__(self):
         return f"Search for {self.isbn} at {self.search_time}"
\ No newline at end of file
@@ -0,0 +1,58 @@
+from operator import attrgetter
+
+from rest_framework import serializers
+
+from .serializers import BookSerializer
+
+BOOK_FIELDS = tuple(BookSerializer.Meta.fields)
+
+# Bumped whenever BOOK_FIELDS changes so stale cache entries are ignored
+_FORMAT = 1
+_DATETIME_FIELDS = ('created_at', 'updated_at')
+_DATETIME_INDEXES = tuple(BOOK_FIELDS.index(name) for name in _DATETIME_FIELDS)
+_get_fields = attrgetter(*BOOK_FIELDS)
+_datetime_field = serializers.DateTimeField()
+
+
+class BookRecord:
+    """
+    Lightweight, read-only stand-in for a Book as kept in the cache.
+
+    Holds exactly the fields BookSerializer outputs, already in their serialized
+    form, so it can be turned into a response without building a model instance.
+    """
+
+    __slots__ = BOOK_FIELDS
+
+    @classmethod
+    def decode(cls, values):
+        """Rebuild a record from encode_book() output, or None if not a record"""
+        if type(values) is not tuple or not values or values[0] != _FORMAT:
+            return None
+        record = cls.__new__(cls)
+        for name, value in zip(BOOK_FIELDS, values[1:]):
+            setattr(record, name, value)
+        return record
+
+    def as_dict(self):
+        """Same data as BookSerializer(book).data"""
+        return {name: getattr(self, name) for name in BOOK_FIELDS}
+
+    def __str__(self):
+        return f"{self.title} ({self.isbn})"
+
+
+def encode_book(book):
+    """Encode a Book into the compact tuple stored in the cache"""
+    values = list(_get_fields(book))
+    for i in _DATETIME_INDEXES:
+        if values[i] is not None:
+            values[i] = _datetime_field.to_representation(values[i])
+    return (_FORMAT, *values)
+
+
+def serialize_book(book):
+    """Response data for either a Book instance or a cached BookRecord"""
+    if isinstance(book, BookRecord):
+        return book.as_dict()
+    return BookSerializer(book).data
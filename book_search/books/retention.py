@@ -0,0 +1,169 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import SearchHistory
+
+ARCHIVE_PREFIX = 'search_history-'
+ARCHIVE_SUFFIX = '.jsonl.gz'
+PERIOD_FORMATS = {
+    'day': '%Y-%m-%d',
+    'month': '%Y-%m',
+}
+_FIELDS = ('id', 'isbn', 'search_time', 'found', 'response_time_ms', 'data_source')
+
+
+def _archive_path(archive_dir, period_key):
+    return Path(archive_dir) / f"{ARCHIVE_PREFIX}{period_key}{ARCHIVE_SUFFIX}"
+
+
+def _period_bounds(period_key):
+    """First day of a period and first day after it, from an archive's period key"""
+    if len(period_key) == len('2026-01-01'):
+        start = datetime.strptime(period_key, PERIOD_FORMATS['day']).date()
+        return start, start + timedelta(days=1)
+    start = datetime.strptime(period_key, PERIOD_FORMATS['month']).date()
+    return start, (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def archive_files(archive_dir):
+    """Return (period_key, path) for every archive file, oldest period first"""
+    directory = Path(archive_dir)
+    if not directory.is_dir():
+        return []
+    files = []
+    for path in directory.glob(f"{ARCHIVE_PREFIX}*{ARCHIVE_SUFFIX}"):
+        period_key = path.name[len(ARCHIVE_PREFIX):-len(ARCHIVE_SUFFIX)]
+        files.append((period_key, path))
+    return sorted(files)
+
+
+def archive_search_history(archive_dir, days, period='month', batch_size=1000, pause=0.0, dry_run=False):
+    """
+    Move SearchHistory rows older than ``days`` into gzipped JSON Lines files.
+
+    Rows are handled ``batch_size`` at a time: each batch is appended to the
+    archive of its period (as a new gzip member) and flushed to disk before it
+    is deleted in its own short transaction, so no long write lock is held. If
+    the process dies between the two steps the batch is archived again on the
+    next run; readers and compaction drop the duplicates by id.
+
+    Returns a dict of period key -> number of rows archived.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    period_format = PERIOD_FORMATS[period]
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = {}
+    last_id = 0
+
+    while True:
+        rows = list(
+            SearchHistory.objects
+            .filter(search_time__lt=cutoff, id__gt=last_id)
+            .order_by('id')
+            .values(*_FIELDS)[:batch_size]
+        )
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        by_period = {}
+        for row in rows:
+            period_key = row['search_time'].strftime(period_format)
+            row['search_time'] = row['search_time'].isoformat()
+            by_period.setdefault(period_key, []).append(row)
+
+        for period_key, period_rows in by_period.items():
+            archived[period_key] = archived.get(period_key, 0) + len(period_rows)
+            if dry_run:
+                continue
+            with open(_archive_path(archive_dir, period_key), 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                    for row in period_rows:
+                        f.write(json.dumps(row).encode() + b'\n')
+                raw.flush()
+                os.fsync(raw.fileno())
+
+        if not dry_run:
+            with transaction.atomic():
+                SearchHistory.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        if pause:
+            time.sleep(pause)
+
+    return archived
+
+
+def read_archives(archive_dir, since=None, until=None, isbn=None, found=None):
+    """
+    Yield archived SearchHistory rows as dicts, oldest period first.
+
+    ``since`` and ``until`` are dates (inclusive, exclusive); only the archive
+    files whose period overlaps them are opened.
+    """
+    for period_key, path in archive_files(archive_dir):
+        start, end = _period_bounds(period_key)
+        if (since and end <= since) or (until and start >= until):
+            continue
+
+        seen = set()
+        with gzip.open(path, 'rt') as f:
+            for line in f:
+                row = json.loads(line)
+                if row['id'] in seen:
+                    continue
+                seen.add(row['id'])
+                if isbn and row['isbn'] != isbn:
+                    continue
+                if found is not None and row['found'] != found:
+                    continue
+                if since or until:
+                    day = parse_datetime(row['search_time']).date()
+                    if (since and day < since) or (until and day >= until):
+                        continue
+                yield row
+
+
+def compact_archives(archive_dir, periods=None):
+    """
+    Rewrite archives as a single gzip member without duplicate rows.
+
+    Rows are streamed from the old file to the new one in archive order, keeping
+    the first copy of each id, so only the set of ids seen is held in memory.
+    Only the given ``periods`` are rewritten when provided, typically the ones
+    just appended to. Returns a dict of period key -> (rows before, rows after).
+    """
+    compacted = {}
+    for period_key, path in archive_files(archive_dir):
+        if periods is not None and period_key not in periods:
+            continue
+        seen = set()
+        before = 0
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with gzip.open(path, 'rt') as src, gzip.open(tmp_path, 'wt', compresslevel=9) as dst:
+            for line in src:
+                before += 1
+                row_id = json.loads(line)['id']
+                if row_id in seen:
+                    continue
+                seen.add(row_id)
+                dst.write(line)
+        os.replace(tmp_path, path)
+        compacted[period_key] = (before, len(seen))
+    return compacted
+
+
+def parse_period_date(value):
+    """Parse YYYY-MM-DD or YYYY-MM into a date, for command line arguments"""
+    for period_format in ('%Y-%m-%d', '%Y-%m'):
+        try:
+            return datetime.strptime(value, period_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Expected YYYY-MM-DD or YYYY-MM, got '{value}'")
@@ -1,21 +1,40 @@
-import requests
+import json
 import re
 import time
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from django.core.cache import cache
 from django.conf import settings
+from django.db import IntegrityError
+from .isbn_filter import get_isbn_filter
+from .isbn_ranges import get_range_index
 from .models import Book, SearchHistory
+from .records import BookRecord, encode_book, serialize_book
+from .upstream_store import get_upstream_store
 import logging  
-from decouple import config
 
-GOOGLE_BOOKS_API_KEY = config('GOOGLE_BOOKS_API_KEY')
 logger = logging.getLogger(__name__)
 
+CACHE_TIMEOUT = 3600  # Cache books for 1 hour
+
+
+def book_cache_key(isbn):
+    """Cache key under which a looked-up book is stored"""
+    return f"isbn_{isbn}"
+
 class ISBNService:
-    """Service class to handle ISBN lookups from multiple sources"""
+    """
+    Service class to handle ISBN lookups from multiple sources
+    
+    Cheap to construct: the HTTP and HTML parsing libraries the fetchers need are
+    only imported once an upstream source is actually queried.
+    """
     
-    def __init__(self):
-        self.sources = [
+    # Names the raw response store files each source under, in lookup priority order
+    SOURCE_NAMES = ['google_books', 'openlibrary', 'worldcat']
+    
+    @property
+    def sources(self):
+        return [
             self._fetch_from_google_books,
             self._fetch_from_openlibrary,
             self._fetch_from_worldcat,
@@ -72,6 +91,42 @@ class ISBNService:
         
         return str(check_digit) == isbn[-1]
     
+    def to_isbn13(self, isbn):
+        """Convert an ISBN-10 to its ISBN-13 form"""
+        isbn = self.normalize_isbn(isbn)
+        if len(isbn) == 13:
+            return isbn
+        
+        body = '978' + isbn[:9]
+        check = 0
+        for i, char in enumerate(body):
+            check += int(char) * (3 if i % 2 else 1)
+        return body + str((10 - check % 10) % 10)
+    
+    def describe_isbn(self, isbn):
+        """Hyphenate an ISBN and identify its registration group and registrant"""
+        range_index = get_range_index()
+        if range_index is None or not self.validate_isbn(isbn):
+            return None
+        
+        isbn = self.normalize_isbn(isbn)
+        info = range_index.lookup(self.to_isbn13(isbn))
+        if info is None:
+            return None
+        
+        details = info.as_dict()
+        details['isbn_13_hyphenated'] = info.hyphenated
+        if len(isbn) == 10:
+            # ISBN-10 parts, which end in their own check digit
+            details['hyphenated'] = f"{info.group}-{info.registrant}-{info.publication}-{isbn[-1]}"
+            details['check_digit'] = isbn[-1]
+        return details
+    
+    def hyphenate_isbn(self, isbn):
+        """Return the properly hyphenated ISBN, or None if its range is unknown"""
+        details = self.describe_isbn(isbn)
+        return details['hyphenated'] if details else None
+    
     def search_book(self, isbn):
         """Main method to search for a book by ISBN"""
         start_time = time.time()
@@ -86,40 +141,23 @@ class ISBNService:
             )
             return None, "Invalid ISBN format"
         
-        # Check cache first
-        cache_key = f"isbn_{isbn}"
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            SearchHistory.objects.create(
-                isbn=isbn,
-                found=True,
-                response_time_ms=int((time.time() - start_time) * 1000),
-                data_source="cache"
-            )
-            return cached_result, None
-        
-        # Check database
-        try:
-            book = Book.objects.get(isbn=isbn)
-            cache.set(cache_key, book, timeout=3600)  # Cache for 1 hour
+        # Check cache, then database
+        book, data_source = self._find_local(isbn)
+        if book:
             SearchHistory.objects.create(
                 isbn=isbn,
                 found=True,
                 response_time_ms=int((time.time() - start_time) * 1000),
-                data_source="database"
+                data_source=data_source
             )
             return book, None
-        except Book.DoesNotExist:
-            pass
         
         # Try each source
         for source_func in self.sources:
             try:
                 book_data = source_func(isbn)
                 if book_data:
-                    # Create and save book
-                    book = Book.objects.create(**book_data)
-                    cache.set(cache_key, book, timeout=3600)
+                    book = self._save_book(isbn, book_data)
                     
                     SearchHistory.objects.create(
                         isbn=isbn,
@@ -140,6 +178,143 @@ class ISBNService:
         )
         return None, "Book not found in any source"
     
+    def stream_book(self, isbn):
+        """
+        Search for a book by ISBN, yielding (event, payload) pairs as results arrive
+        
+        Emits "local" straight after the cache and database checks, then on a miss
+        queries every source concurrently and emits "partial" as each one answers.
+        The book persisted is the one search_book would have picked, so "final" is
+        sent once every higher-priority source has come back empty.
+        """
+        start_time = time.time()
+        isbn = self.normalize_isbn(isbn)
+        
+        if not self.validate_isbn(isbn):
+            SearchHistory.objects.create(
+                isbn=isbn,
+                found=False,
+                response_time_ms=int((time.time() - start_time) * 1000)
+            )
+            yield 'error', {'isbn': isbn, 'message': 'Invalid ISBN format'}
+            return
+        
+        book, data_source = self._find_local(isbn)
+        yield 'local', {'isbn': isbn, 'hit': book is not None, 'source': data_source}
+        if book:
+            SearchHistory.objects.create(
+                isbn=isbn,
+                found=True,
+                response_time_ms=int((time.time() - start_time) * 1000),
+                data_source=data_source
+            )
+            yield 'final', {'source': data_source, 'data': serialize_book(book)}
+            return
+        
+        sources = self.sources
+        results = [None] * len(sources)
+        pending = set(range(len(sources)))
+        executor = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix='isbn-stream')
+        try:
+            futures = {executor.submit(source_func, isbn): i for i, source_func in enumerate(sources)}
+            for future in as_completed(futures):
+                i = futures[future]
+                pending.discard(i)
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching from {sources[i].__name__}: {str(e)}")
+                
+                if results[i]:
+                    yield 'partial', {
+                        'source': results[i].get('data_source', 'unknown'),
+                        'data': results[i]
+                    }
+                
+                # Persist the first source in priority order once nothing before it is pending
+                for j in range(len(sources)):
+                    if j in pending:
+                        break
+                    if results[j]:
+                        try:
+                            book = self._save_book(isbn, results[j])
+                        except Exception as e:
+                            # Like search_book, fall through to the next source
+                            logger.error(f"Error saving result from {sources[j].__name__}: {str(e)}")
+                            results[j] = None
+                            continue
+                        data_source = results[j].get('data_source', 'unknown')
+                        SearchHistory.objects.create(
+                            isbn=isbn,
+                            found=True,
+                            response_time_ms=int((time.time() - start_time) * 1000),
+                            data_source=data_source
+                        )
+                        yield 'final', {'source': data_source, 'data': serialize_book(book)}
+                        return
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        SearchHistory.objects.create(
+            isbn=isbn,
+            found=False,
+            response_time_ms=int((time.time() - start_time) * 1000)
+        )
+        yield 'not_found', {'isbn': isbn, 'message': 'Book not found in any source'}
+    
+    def _find_local(self, isbn):
+        """Look a normalized ISBN up in the cache, then the database"""
+        cache_key = book_cache_key(isbn)
+        cached_result = BookRecord.decode(cache.get(cache_key))
+        if cached_result:
+            return cached_result, "cache"
+        
+        # Skip the database when the ISBN filter knows the book was never stored
+        isbn_filter = get_isbn_filter()
+        if isbn_filter is None or isbn_filter.might_contain(isbn):
+            try:
+                book = Book.objects.get(isbn=isbn)
+                cache.set(cache_key, encode_book(book), timeout=CACHE_TIMEOUT)
+                return book, "database"
+            except Book.DoesNotExist:
+                pass
+        
+        return None, None
+    
+    def _save_book(self, isbn, book_data):
+        """Store book data fetched from a source and cache it"""
+        try:
+            book = Book.objects.create(**book_data)
+        except IntegrityError:
+            # Stored meanwhile by another worker the filter hadn't heard from
+            book = Book.objects.get(isbn=isbn)
+            isbn_filter = get_isbn_filter()
+            if isbn_filter is not None:
+                isbn_filter.add(book.isbn, book.isbn_10, book.isbn_13)
+        cache.set(book_cache_key(isbn), encode_book(book), timeout=CACHE_TIMEOUT)
+        return book
+    
+    def _fetch(self, source, isbn, url, parse, headers=None):
+        """GET an upstream URL and parse it, through the raw response store when enabled"""
+        store = get_upstream_store()
+        if store is None:
+            import requests
+            
+            response = requests.get(url, headers=headers, timeout=10)
+            response.raise_for_status()
+            return parse(response)
+        return store.fetch(source, isbn, url, parse, headers=headers, timeout=10)
+    
+    def parse_stored_response(self, source, isbn, content):
+        """Re-derive book data from a raw upstream payload, without any network"""
+        if source == 'google_books':
+            return self._parse_google_books(isbn, json.loads(content))
+        if source == 'openlibrary':
+            return self._parse_openlibrary(isbn, json.loads(content))
+        if source == 'worldcat':
+            return self._parse_worldcat(isbn, content)
+        raise ValueError(f"Unknown source: {source}")
+    
     def _fetch_from_google_books(self, isbn):
         """Fetch book data from Google Books API using API key"""
         api_key = getattr(settings, 'GOOGLE_BOOKS_API_KEY', None)
@@ -147,146 +322,166 @@ class ISBNService:
             logger.error("Google Books API key not configured")
             return None
         
-        url = f"https://www.googleapis.com/books/v1/volumes?q=isbn:{isbn}&key={api_key}"
+        url = f"{settings.GOOGLE_BOOKS_API_URL}?q=isbn:{isbn}&key={api_key}"
         
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('totalItems', 0) > 0:
-                item = data['items'][0]
-                volume_info = item.get('volumeInfo', {})
-                
-                # Extract image links
-                image_links = volume_info.get('imageLinks', {})
-                
-                book_data = {
-                    'isbn': isbn,
-                    'isbn_10': self._extract_isbn(volume_info.get('industryIdentifiers', []), 'ISBN_10'),
-                    'isbn_13': self._extract_isbn(volume_info.get('industryIdentifiers', []), 'ISBN_13'),
-                    'title': volume_info.get('title', ''),
-                    'subtitle': volume_info.get('subtitle'),
-                    'authors': volume_info.get('authors', []),
-                    'publisher': volume_info.get('publisher'),
-                    'published_date': volume_info.get('publishedDate'),
-                    'description': volume_info.get('description'),
-                    'page_count': volume_info.get('pageCount'),
-                    'categories': volume_info.get('categories', []),
-                    'language': volume_info.get('language'),
-                    'thumbnail': image_links.get('thumbnail'),
-                    'small_thumbnail': image_links.get('smallThumbnail'),
-                    'preview_link': volume_info.get('previewLink'),
-                    'info_link': volume_info.get('infoLink'),
-                    'average_rating': volume_info.get('averageRating'),
-                    'ratings_count': volume_info.get('ratingsCount'),
-                    'maturity_rating': volume_info.get('maturityRating'),
-                    'data_source': 'Google Books'
-                }
-                
-                return book_data
+            return self._fetch(
+                'google_books', isbn, url,
+                lambda response: self._parse_google_books(isbn, response.json())
+            )
         except Exception as e:
             logger.error(f"Google Books API error: {str(e)}")
         
         return None
     
+    def _parse_google_books(self, isbn, data):
+        """Build book data from a Google Books volumes response"""
+        if data.get('totalItems', 0) > 0:
+            item = data['items'][0]
+            volume_info = item.get('volumeInfo', {})
+            
+            # Extract image links
+            image_links = volume_info.get('imageLinks', {})
+            
+            book_data = {
+                'isbn': isbn,
+                'isbn_10': self._extract_isbn(volume_info.get('industryIdentifiers', []), 'ISBN_10'),
+                'isbn_13': self._extract_isbn(volume_info.get('industryIdentifiers', []), 'ISBN_13'),
+                'title': volume_info.get('title', ''),
+                'subtitle': volume_info.get('subtitle'),
+                'authors': volume_info.get('authors', []),
+                'publisher': volume_info.get('publisher'),
+                'published_date': volume_info.get('publishedDate'),
+                'description': volume_info.get('description'),
+                'page_count': volume_info.get('pageCount'),
+                'categories': volume_info.get('categories', []),
+                'language': volume_info.get('language'),
+                'thumbnail': image_links.get('thumbnail'),
+                'small_thumbnail': image_links.get('smallThumbnail'),
+                'preview_link': volume_info.get('previewLink'),
+                'info_link': volume_info.get('infoLink'),
+                'average_rating': volume_info.get('averageRating'),
+                'ratings_count': volume_info.get('ratingsCount'),
+                'maturity_rating': volume_info.get('maturityRating'),
+                'data_source': 'Google Books'
+            }
+            
+            return book_data
+        
+        return None
+    
     def _fetch_from_openlibrary(self, isbn):
         """Fetch book data from Open Library API"""
-        url = f"https://openlibrary.org/api/books?bibkeys=ISBN:{isbn}&jscmd=data&format=json"
+        url = f"{settings.OPENLIBRARY_API_URL}?bibkeys=ISBN:{isbn}&jscmd=data&format=json"
         
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            book_key = f"ISBN:{isbn}"
-            if book_key in data:
-                book_info = data[book_key]
-                
-                # Extract authors
-                authors = []
-                if 'authors' in book_info:
-                    authors = [author.get('name', '') for author in book_info['authors']]
-                
-                # Extract publishers
-                publishers = book_info.get('publishers', [])
-                publisher = publishers[0].get('name', '') if publishers else None
-                
-                # Extract cover
-                cover = book_info.get('cover', {})
-                
-                book_data = {
-                    'isbn': isbn,
-                    'title': book_info.get('title', ''),
-                    'subtitle': book_info.get('subtitle'),
-                    'authors': authors,
-                    'publisher': publisher,
-                    'published_date': book_info.get('publish_date'),
-                    'description': book_info.get('description', {}).get('value') if isinstance(book_info.get('description'), dict) else book_info.get('description'),
-                    'page_count': book_info.get('number_of_pages'),
-                    'thumbnail': cover.get('medium'),
-                    'small_thumbnail': cover.get('small'),
-                    'preview_link': book_info.get('url'),
-                    'data_source': 'Open Library'
-                }
-                
-                return book_data
+            return self._fetch(
+                'openlibrary', isbn, url,
+                lambda response: self._parse_openlibrary(isbn, response.json())
+            )
         except Exception as e:
             logger.error(f"Open Library API error: {str(e)}")
         
         return None
     
+    def _parse_openlibrary(self, isbn, data):
+        """Build book data from an Open Library books API response"""
+        book_key = f"ISBN:{isbn}"
+        if book_key in data:
+            book_info = data[book_key]
+            
+            # Extract authors
+            authors = []
+            if 'authors' in book_info:
+                authors = [author.get('name', '') for author in book_info['authors']]
+            
+            # Extract publishers
+            publishers = book_info.get('publishers', [])
+            publisher = publishers[0].get('name', '') if publishers else None
+            
+            # Extract cover
+            cover = book_info.get('cover', {})
+            
+            book_data = {
+                'isbn': isbn,
+                'title': book_info.get('title', ''),
+                'subtitle': book_info.get('subtitle'),
+                'authors': authors,
+                'publisher': publisher,
+                'published_date': book_info.get('publish_date'),
+                'description': book_info.get('description', {}).get('value') if isinstance(book_info.get('description'), dict) else book_info.get('description'),
+                'page_count': book_info.get('number_of_pages'),
+                'thumbnail': cover.get('medium'),
+                'small_thumbnail': cover.get('small'),
+                'preview_link': book_info.get('url'),
+                'data_source': 'Open Library'
+            }
+            
+            return book_data
+        
+        return None
+    
     def _fetch_from_worldcat(self, isbn):
         """Fetch book data from WorldCat (web scraping)"""
-        url = f"https://www.worldcat.org/isbn/{isbn}"
+        url = f"{settings.WORLDCAT_URL}/{isbn}"
         
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract title
-            title_elem = soup.find('h1', {'id': 'title'})
-            title = title_elem.get_text(strip=True) if title_elem else ''
-            
-            # Extract author
-            author_elem = soup.find('a', {'id': 'author'})
-            authors = [author_elem.get_text(strip=True)] if author_elem else []
-            
-            # Extract publisher and date
-            publisher_elem = soup.find('td', string='Publisher:')
-            publisher = ''
-            published_date = ''
-            if publisher_elem and publisher_elem.find_next_sibling('td'):
-                pub_text = publisher_elem.find_next_sibling('td').get_text(strip=True)
-                # Try to split publisher and date
-                parts = pub_text.split(',')
-                if len(parts) >= 2:
-                    publisher = parts[0].strip()
-                    published_date = parts[-1].strip()
-                else:
-                    publisher = pub_text
-            
-            if title:  # Only return if we found at least a title
-                book_data = {
-                    'isbn': isbn,
-                    'title': title,
-                    'authors': authors,
-                    'publisher': publisher,
-                    'published_date': published_date,
-                    'data_source': 'WorldCat'
-                }
-                return book_data
+            return self._fetch(
+                'worldcat', isbn, url,
+                lambda response: self._parse_worldcat(isbn, response.content),
+                headers=headers
+            )
         except Exception as e:
             logger.error(f"WorldCat scraping error: {str(e)}")
         
         return None
     
+    def _parse_worldcat(self, isbn, content):
+        """Build book data from a WorldCat record page"""
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(content, 'html.parser')
+        
+        # Extract title
+        title_elem = soup.find('h1', {'id': 'title'})
+        title = title_elem.get_text(strip=True) if title_elem else ''
+        
+        # Extract author
+        author_elem = soup.find('a', {'id': 'author'})
+        authors = [author_elem.get_text(strip=True)] if author_elem else []
+        
+        # Extract publisher and date
+        publisher_elem = soup.find('td', string='Publisher:')
+        publisher = ''
+        published_date = ''
+        if publisher_elem and publisher_elem.find_next_sibling('td'):
+            pub_text = publisher_elem.find_next_sibling('td').get_text(strip=True)
+            # Try to split publisher and date
+            parts = pub_text.split(',')
+            if len(parts) >= 2:
+                publisher = parts[0].strip()
+                published_date = parts[-1].strip()
+            else:
+                publisher = pub_text
+        
+        if title:  # Only return if we found at least a title
+            book_data = {
+                'isbn': isbn,
+                'title': title,
+                'authors': authors,
+                'publisher': publisher,
+                'published_date': published_date,
+                'data_source': 'WorldCat'
+            }
+            return book_data
+        
+        return None
+    
+    
     def _extract_isbn(self, identifiers, isbn_type):
         """Extract specific ISBN type from identifiers list"""
         for identifier in identifiers:
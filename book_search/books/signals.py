@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .isbn_filter import get_isbn_filter
+from .models import Book
+
+
+@receiver(post_save, sender=Book)
+def add_book_to_isbn_filter(sender, instance, **kwargs):
+    """Keep the ISBN filter in step with newly stored books"""
+    isbn_filter = get_isbn_filter()
+    if isbn_filter is not None:
+        isbn_filter.add(instance.isbn, instance.isbn_10, instance.isbn_13)
@@ -0,0 +1,211 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StoredResponse:
+    """Upstream response body as served from, or recorded into, the store"""
+
+    __slots__ = ('status_code', 'content', 'headers', 'revalidated')
+
+    def __init__(self, status_code, content, headers, revalidated=False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.revalidated = revalidated
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        pass
+
+
+def _cache_control(headers):
+    """Parse a Cache-Control header into a dict of lower-cased directives"""
+    directives = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _redact(url):
+    return re.sub(r'([?&]key=)[^&]*', r'\1REDACTED', url)
+
+
+class UpstreamResponseStore:
+    """
+    Raw upstream HTTP responses on local disk, keyed by source and ISBN.
+
+    Each entry is a body file plus a JSON metadata file holding the validators
+    (ETag, Last-Modified) and freshness lifetime from Cache-Control. Fresh
+    entries are served without a request, stale ones are revalidated with a
+    conditional request. Every successful response is written, including those
+    the parsers find no book in, so a fixed parser can be replayed over them;
+    responses marked no-store are never written. Disk use is bounded by prune().
+    """
+
+    def __init__(self, root, default_max_age=0):
+        self.root = Path(root)
+        self.default_max_age = default_max_age
+
+    def _paths(self, source, isbn):
+        directory = self.root / source / isbn[-3:]
+        return directory / f"{isbn}.body", directory / f"{isbn}.json"
+
+    def load(self, source, isbn):
+        """Return (metadata, body) for a stored response, or None"""
+        body_path, meta_path = self._paths(source, isbn)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta, body
+
+    def _write(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _max_age(self, headers):
+        directives = _cache_control(headers)
+        if 'no-cache' in directives:
+            return 0
+        try:
+            return int(directives.get('max-age', self.default_max_age))
+        except ValueError:
+            return self.default_max_age
+
+    def save(self, source, isbn, url, response):
+        """Record a successful upstream response unless it is marked no-store"""
+        if 'no-store' in _cache_control(response.headers):
+            return
+        body_path, meta_path = self._paths(source, isbn)
+        meta = {
+            'source': source,
+            'isbn': isbn,
+            'url': _redact(url),
+            'status_code': response.status_code,
+            'content_type': response.headers.get('Content-Type'),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'max_age': self._max_age(response.headers),
+            'fetched_at': time.time(),
+        }
+        # Body first, so metadata never points at a missing or older body
+        self._write(body_path, response.content)
+        self._write(meta_path, json.dumps(meta).encode())
+
+    def fetch(self, source, isbn, url, parse, headers=None, timeout=10):
+        """
+        GET ``url``, answering from the store or revalidating when possible.
+
+        Returns ``parse(response)``. The response is stored before parsing, so
+        it is kept even when the parser finds nothing in it or fails.
+        """
+        import requests
+
+        stored = self.load(source, isbn)
+        request_headers = dict(headers or {})
+
+        if stored:
+            meta, body = stored
+            stored_headers = {'Content-Type': meta.get('content_type') or ''}
+            if time.time() < meta['fetched_at'] + meta['max_age']:
+                return parse(StoredResponse(meta['status_code'], body, stored_headers))
+            if meta.get('etag'):
+                request_headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request_headers['If-Modified-Since'] = meta['last_modified']
+
+        response = requests.get(url, headers=request_headers, timeout=timeout)
+
+        if stored and response.status_code == 304:
+            meta['fetched_at'] = time.time()
+            meta['max_age'] = self._max_age(response.headers)
+            meta['etag'] = response.headers.get('ETag', meta.get('etag'))
+            _, meta_path = self._paths(source, isbn)
+            self._write(meta_path, json.dumps(meta).encode())
+            return parse(StoredResponse(meta['status_code'], body, stored_headers, revalidated=True))
+
+        response.raise_for_status()
+        try:
+            self.save(source, isbn, url, response)
+        except OSError as e:
+            logger.error(f"Could not store {source} response for {isbn}: {str(e)}")
+        return parse(response)
+
+    def _sources(self, source=None):
+        if source:
+            return [source]
+        if self.root.is_dir():
+            return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+        return []
+
+    def entries(self, source=None):
+        """Yield (source, isbn, body) for every stored response"""
+        for name in self._sources(source):
+            for meta_path in sorted((self.root / name).glob('*/*.json')):
+                isbn = meta_path.stem
+                stored = self.load(name, isbn)
+                if stored:
+                    yield name, isbn, stored[1]
+
+    def prune(self, max_age_days, source=None, dry_run=False):
+        """
+        Delete responses not fetched or revalidated in the last ``max_age_days``.
+
+        Entries whose metadata cannot be read are deleted too. Returns a dict of
+        source -> (entries removed, bytes freed).
+        """
+        cutoff = time.time() - max_age_days * 86400
+        pruned = {}
+        for name in self._sources(source):
+            removed = freed = 0
+            for meta_path in (self.root / name).glob('*/*.json'):
+                try:
+                    with open(meta_path) as f:
+                        fetched_at = json.load(f)['fetched_at']
+                except (OSError, ValueError, KeyError):
+                    fetched_at = 0
+                if fetched_at >= cutoff:
+                    continue
+
+                body_path = meta_path.with_suffix('.body')
+                for path in (meta_path, body_path):
+                    try:
+                        freed += path.stat().st_size
+                        if not dry_run:
+                            path.unlink()
+                    except FileNotFoundError:
+                        pass
+                removed += 1
+            pruned[name] = (removed, freed)
+        return pruned
+
+
+def get_upstream_store():
+    """Return the configured response store, or None when disabled"""
+    root = getattr(settings, 'UPSTREAM_STORE_DIR', '')
+    if not root:
+        return None
+    return UpstreamResponseStore(root, settings.UPSTREAM_STORE_DEFAULT_MAX_AGE)
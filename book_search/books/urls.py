@@ -2,10 +2,13 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("books/search/",         views.search_book,         name="search_book"),
-    path("books/validate/",       views.validate_isbn,       name="validate_isbn"),
-    path("books/recent/",         views.list_recent_books,   name="recent_books"),
-    path("books/history/",        views.search_history,      name="search_history"),
-    path("books/<str:isbn>/",     views.get_book_by_isbn,    name="book_detail"),
-    path("health/",               views.health_check,        name="health_check"),
+    path("books/search/",                   views.search_book,         name="search_book"),
+    path("books/search/stream/",            views.stream_search_book,  name="stream_search_book"),
+    path("books/validate/",                 views.validate_isbn,       name="validate_isbn"),
+    path("books/recent/",                   views.list_recent_books,   name="recent_books"),
+    path("books/history/",                  views.search_history,      name="search_history"),
+    path("books/jobs/<str:job_id>/",        views.lookup_job,          name="lookup_job"),
+    path("books/jobs/<str:job_id>/stream/", views.lookup_job_stream,   name="lookup_job_stream"),
+    path("books/<str:isbn>/",               views.get_book_by_isbn,    name="book_detail"),
+    path("health/",                         views.health_check,        name="health_check"),
 ]
\ No newline at end of file
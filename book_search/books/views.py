@@ -3,7 +3,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_GET, require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
@@ -17,10 +20,18 @@ from .serializers import (
     ISBNValidationSerializer,
     SearchHistorySerializer
 )
+from .records import serialize_book
 from .services import ISBNService
+from . import jobs
 
-# Initialize the service
-isbn_service = ISBNService()
+_isbn_service = None
+
+def get_isbn_service():
+    """Return the shared ISBNService, creating it on first use rather than at import"""
+    global _isbn_service
+    if _isbn_service is None:
+        _isbn_service = ISBNService()
+    return _isbn_service
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -32,6 +43,9 @@ def search_book(request):
     {
         "isbn": "9780134685991"
     }
+    
+    With "mode": "async" in the body (or ?mode=async) the lookup is queued and
+    202 Accepted is returned with a job id to poll or stream.
     """
     start_time = time.time()
     
@@ -46,16 +60,34 @@ def search_book(request):
     
     isbn = serializer.validated_data['isbn']
     
+    mode = request.query_params.get('mode') or request.data.get('mode')
+    if mode == 'async':
+        try:
+            job = jobs.submit_lookup(get_isbn_service(), isbn)
+        except jobs.JobBacklogFull:
+            return Response({
+                'success': False,
+                'message': 'Too many lookups queued, try again later'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': '5'})
+        status_url = reverse('lookup_job', args=[job['id']])
+        return Response({
+            'success': True,
+            'job_id': job['id'],
+            'status': job['status'],
+            'status_url': status_url,
+            'stream_url': reverse('lookup_job_stream', args=[job['id']]),
+            'message': 'Lookup queued'
+        }, status=status.HTTP_202_ACCEPTED, headers={'Location': status_url})
+    
     # Search for book
-    book, error_message = isbn_service.search_book(isbn)
+    book, error_message = get_isbn_service().search_book(isbn)
     
     search_time_ms = int((time.time() - start_time) * 1000)
     
     if book:
-        book_serializer = BookSerializer(book)
         response_data = {
             'success': True,
-            'data': book_serializer.data,
+            'data': serialize_book(book),
             'search_time_ms': search_time_ms,
             'message': 'Book found successfully'
         }
@@ -68,6 +100,129 @@ def search_book(request):
         }
         return Response(response_data, status=status.HTTP_404_NOT_FOUND)
 
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def stream_search_book(request):
+    """
+    Search for a book by ISBN, streaming results as each source responds
+    
+    POST /api/books/search/stream/   {"isbn": "9780134685991"}
+    GET  /api/books/search/stream/?isbn=9780134685991
+    
+    Sends newline-delimited JSON objects with an "event" key by default, or
+    server-sent events with ?format=sse or an Accept: text/event-stream header.
+    Events: local, partial (one per source with data), then final or not_found.
+    """
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            # Valid JSON that is not an object, e.g. [1] or "x"
+            data = {}
+    else:
+        data = request.GET
+    
+    serializer = ISBNValidationSerializer(data={'isbn': data.get('isbn')})
+    if not serializer.is_valid():
+        return JsonResponse({
+            'success': False,
+            'message': 'Invalid request data',
+            'errors': serializer.errors
+        }, status=400)
+    
+    isbn = serializer.validated_data['isbn']
+    use_sse = (
+        request.GET.get('format') == 'sse'
+        or 'text/event-stream' in request.headers.get('Accept', '')
+    )
+    
+    def events():
+        for event, payload in get_isbn_service().stream_book(isbn):
+            if use_sse:
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+            else:
+                yield json.dumps({'event': event, **payload}) + '\n'
+    
+    response = StreamingHttpResponse(
+        events(), content_type='text/event-stream' if use_sse else 'application/x-ndjson'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def lookup_job(request, job_id):
+    """
+    Poll an asynchronous lookup job
+    
+    GET /api/books/jobs/{job_id}/
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        return Response({
+            'success': False,
+            'message': 'Job not found or expired'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response({
+        'success': True,
+        'job_id': job['id'],
+        'isbn': job['isbn'],
+        'status': job['status'],
+        'created_at': job['created_at'],
+        'finished_at': job['finished_at'],
+        'result': job['result']
+    })
+
+@require_GET
+def lookup_job_stream(request, job_id):
+    """
+    Stream an asynchronous lookup job as server-sent events
+    
+    GET /api/books/jobs/{job_id}/stream/
+    
+    Sends a "status" event whenever the job state changes and a final "result"
+    event once it has finished. The stream is held for at most
+    BOOK_JOB_STREAM_TIMEOUT seconds so it does not tie up a worker thread; after
+    that it ends and EventSource reconnects after the "retry" interval sent up
+    front. Plain Django view, since DRF content negotiation would reject the
+    text/event-stream Accept header.
+    """
+    if jobs.get_job(job_id) is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Job not found or expired'
+        }, status=404)
+    
+    def events():
+        deadline = time.monotonic() + settings.BOOK_JOB_STREAM_TIMEOUT
+        last_status = None
+        yield f"retry: {settings.BOOK_JOB_STREAM_RETRY_MS}\n\n"
+        while True:
+            job = jobs.get_job(job_id)
+            if job is None:
+                yield 'event: error\ndata: {"message": "Job expired"}\n\n'
+                return
+            if job['status'] != last_status:
+                last_status = job['status']
+                yield f"event: status\ndata: {json.dumps({'status': last_status})}\n\n"
+            if job['status'] in jobs.FINISHED_STATES:
+                yield f"event: result\ndata: {json.dumps(job['result'])}\n\n"
+                return
+            if time.monotonic() >= deadline:
+                # Let the client reconnect rather than hold this thread
+                return
+            yield ': keep-alive\n\n'
+            time.sleep(settings.BOOK_JOB_STREAM_POLL_INTERVAL)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def validate_isbn(request):
@@ -88,12 +243,17 @@ def validate_isbn(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     isbn = serializer.validated_data['isbn']
+    isbn_service = get_isbn_service()
     is_valid = isbn_service.validate_isbn(isbn)
     
+    details = isbn_service.describe_isbn(isbn) if is_valid else None
+    
     return Response({
         'success': True,
         'valid': is_valid,
         'isbn': isbn_service.normalize_isbn(isbn),
+        'hyphenated': details['hyphenated'] if details else None,
+        'details': details,
         'message': 'ISBN is valid' if is_valid else 'Invalid ISBN format'
     })
 
@@ -105,6 +265,7 @@ def get_book_by_isbn(request, isbn):
     
     GET /api/books/{isbn}/
     """
+    isbn_service = get_isbn_service()
     normalized_isbn = isbn_service.normalize_isbn(isbn)
     try:
         book = Book.objects.get(isbn=normalized_isbn)
@@ -116,10 +277,9 @@ def get_book_by_isbn(request, isbn):
                 'success': False,
                 'message': error_message or 'Book not found'
             }, status=status.HTTP_404_NOT_FOUND)
-    serializer = BookSerializer(book)
     return Response({
         'success': True,
-        'data': serializer.data
+        'data': serialize_book(book)
     })
 
 @api_view(['GET'])
@@ -212,9 +372,12 @@ def not_found(request):
         'message': 'Endpoint not found',
         'available_endpoints': [
             'POST /api/books/search/',
+            'POST /api/books/search/stream/',
             'POST /api/books/validate/',
             'GET /api/books/recent/',
             'GET /api/books/history/',
+            'GET /api/books/jobs/{job_id}/',
+            'GET /api/books/jobs/{job_id}/stream/',
             'GET /api/books/{isbn}/',
             'GET /api/health/'
         ]
@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Book, SearchHistory
+from .records import encode_book
+from .services import CACHE_TIMEOUT, book_cache_key
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupReport:
+    """Outcome of a cache warm-up run"""
+
+    def __init__(self, window_days, limit):
+        self.window_days = window_days
+        self.limit = limit
+        self.ranked = 0             # ISBNs ranked by recent popularity
+        self.cached = 0             # Books actually written to the cache
+        self.traffic_total = 0      # Lookups recorded inside the window
+        self.traffic_covered = 0    # Lookups whose ISBN is now cached
+        self.elapsed_ms = 0
+        self.budget_exhausted = False
+
+    @property
+    def coverage(self):
+        """Share of the recent traffic mix that is now served from cache"""
+        if not self.traffic_total:
+            return 0.0
+        return self.traffic_covered / self.traffic_total * 100
+
+    def as_dict(self):
+        return {
+            'window_days': self.window_days,
+            'limit': self.limit,
+            'ranked': self.ranked,
+            'cached': self.cached,
+            'traffic_total': self.traffic_total,
+            'traffic_covered': self.traffic_covered,
+            'coverage': round(self.coverage, 2),
+            'elapsed_ms': self.elapsed_ms,
+            'budget_exhausted': self.budget_exhausted,
+        }
+
+    def __str__(self):
+        return (
+            f"Warmed {self.cached}/{self.ranked} popular books in {self.elapsed_ms}ms, "
+            f"covering {self.traffic_covered}/{self.traffic_total} lookups "
+            f"({self.coverage:.2f}%) from the last {self.window_days} day(s)"
+            + (" [time budget exhausted]" if self.budget_exhausted else "")
+        )
+
+
+def rank_popular_isbns(window_days, limit):
+    """Return (isbn, hits) pairs for the most searched found ISBNs in the window"""
+    since = timezone.now() - timedelta(days=window_days)
+    rows = (
+        SearchHistory.objects
+        .filter(search_time__gte=since, found=True)
+        .values('isbn')
+        .annotate(hits=Count('id'))
+        .order_by('-hits')[:limit]
+    )
+    return [(row['isbn'], row['hits']) for row in rows]
+
+
+def warm_cache(limit=500, window_days=7, batch_size=100, time_budget=5.0):
+    """
+    Fill the cache with the books most frequently searched recently.
+
+    Books are loaded in bulk, ``batch_size`` ISBNs at a time, and the run stops
+    between batches once ``time_budget`` seconds have been spent so that startup
+    is never blocked for long.
+    """
+    start_time = time.monotonic()
+    deadline = start_time + time_budget
+    report = WarmupReport(window_days, limit)
+
+    since = timezone.now() - timedelta(days=window_days)
+    report.traffic_total = SearchHistory.objects.filter(search_time__gte=since).count()
+
+    ranked = rank_popular_isbns(window_days, limit)
+    report.ranked = len(ranked)
+
+    for offset in range(0, len(ranked), batch_size):
+        if time.monotonic() >= deadline:
+            report.budget_exhausted = True
+            break
+
+        batch = ranked[offset:offset + batch_size]
+        books = Book.objects.in_bulk([isbn for isbn, _ in batch], field_name='isbn')
+        cache.set_many(
+            {book_cache_key(isbn): encode_book(book) for isbn, book in books.items()},
+            timeout=CACHE_TIMEOUT
+        )
+
+        report.cached += len(books)
+        report.traffic_covered += sum(hits for isbn, hits in batch if isbn in books)
+
+    report.elapsed_ms = int((time.monotonic() - start_time) * 1000)
+    return report
+
+
+def start_background_warmup():
+    """
+    Warm the cache from a daemon thread, so the worker can start serving right away.
+
+    Called from wsgi.py/asgi.py with BOOK_CACHE_WARMUP_ON_STARTUP, so only
+    serving processes warm their cache, never migrate or other commands.
+    """
+    threading.Thread(target=_warm_in_background, name='book-cache-warmup', daemon=True).start()
+
+
+def _warm_in_background():
+    from django.db import connection
+
+    try:
+        report = warm_cache(
+            limit=settings.BOOK_CACHE_WARMUP_LIMIT,
+            window_days=settings.BOOK_CACHE_WARMUP_WINDOW_DAYS,
+            batch_size=settings.BOOK_CACHE_WARMUP_BATCH_SIZE,
+            time_budget=settings.BOOK_CACHE_WARMUP_TIME_BUDGET,
+        )
+        logger.info(str(report))
+    except Exception as e:
+        logger.error(f"Cache warm-up failed: {str(e)}")
+    finally:
+        connection.close()